@@ -4,7 +4,6 @@ import argparse
 import sys
 from pathlib import Path
 
-from dineassign.optimizer import optimize_assignments
 from dineassign.output import format_results
 from dineassign.parser import (
     create_reservations_template,
@@ -72,6 +71,9 @@ Examples:
 
     args = parser.parse_args()
 
+    # Deferred: pulls in numpy and scipy, which --help and argument errors don't need
+    from dineassign.optimizer import optimize_assignments
+
     # Normalize day names to lowercase
     days = [d.lower() for d in args.days]
 
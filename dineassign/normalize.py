@@ -1,68 +1,47 @@
 """Preference normalization for dineassign."""
 
-import statistics
+import numpy as np
 
 from dineassign.models import Diner
 
 
-def normalize_preferences(
+def normalize_preference_matrix(
     diners: list[Diner],
     restaurants: list[str],
-) -> dict[str, dict[str, float]]:
+) -> np.ndarray:
     """
     Normalize preferences using Z-score per diner.
 
-    Returns a dict mapping diner_email -> restaurant -> normalized_score.
+    Returns a (num_diners, num_restaurants) array in diner and restaurant order.
     Restaurants where a diner "Can't eat" are mapped to negative infinity.
     """
-    normalized: dict[str, dict[str, float]] = {}
-
-    for diner in diners:
-        # Collect non-excluded scores for this diner
-        valid_scores = [score for score in diner.preferences.values() if score is not None]
-
-        if not valid_scores:
-            # All restaurants excluded - this is a problem
-            normalized[diner.email] = {r: float("-inf") for r in restaurants}
-            continue
-
-        mean = statistics.mean(valid_scores)
-        stdev = statistics.stdev(valid_scores) if len(valid_scores) > 1 else 1.0
-
-        # Avoid division by zero for diners who rated everything the same
-        if stdev == 0:
-            stdev = 1.0
-
-        diner_prefs: dict[str, float] = {}
-        for restaurant in restaurants:
-            raw_score = diner.preferences.get(restaurant)
-            if raw_score is None:
-                # Can't eat here - hard constraint
-                diner_prefs[restaurant] = float("-inf")
-            else:
-                # Z-score normalization
-                diner_prefs[restaurant] = (raw_score - mean) / stdev
-
-        normalized[diner.email] = diner_prefs
-
+    # None ("Can't eat") becomes NaN under the float dtype
+    raw = np.array(
+        [[diner.preferences.get(restaurant) for restaurant in restaurants] for diner in diners],
+        dtype=np.float64,
+    ).reshape(len(diners), len(restaurants))
+    valid = ~np.isnan(raw)
+
+    # Per-diner mean and sample standard deviation over non-excluded scores
+    counts = valid.sum(axis=1, keepdims=True)
+    mean = np.where(valid, raw, 0.0).sum(axis=1, keepdims=True) / np.maximum(counts, 1)
+    squared_dev = np.where(valid, raw - mean, 0.0) ** 2
+    stdev = np.sqrt(squared_dev.sum(axis=1, keepdims=True) / np.maximum(counts - 1, 1))
+
+    # Avoid division by zero for diners with a single rating or who rated everything the same
+    stdev[(counts <= 1) | (stdev == 0)] = 1.0
+
+    normalized = (raw - mean) / stdev
+    # Can't eat here - hard constraint (also covers diners with every restaurant excluded)
+    normalized[~valid] = -np.inf
     return normalized
 
 
-def get_aggregate_preferences(
-    normalized_prefs: dict[str, dict[str, float]],
-    restaurants: list[str],
-) -> dict[str, float]:
+def get_aggregate_preferences(pref_matrix: np.ndarray) -> np.ndarray:
     """
     Compute aggregate preference score per restaurant.
 
-    Returns a dict mapping restaurant -> sum of normalized preferences
-    (excluding -inf values from "Can't eat" responses).
+    Returns an array (in restaurant order) with the sum of normalized preferences
+    per column of pref_matrix, excluding -inf values from "Can't eat" responses.
     """
-    aggregates: dict[str, float] = {r: 0.0 for r in restaurants}
-
-    for diner_prefs in normalized_prefs.values():
-        for restaurant, score in diner_prefs.items():
-            if score != float("-inf"):
-                aggregates[restaurant] += score
-
-    return aggregates
+    return np.where(np.isneginf(pref_matrix), 0.0, pref_matrix).sum(axis=0)
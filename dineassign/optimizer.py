@@ -1,26 +1,25 @@
 """ILP-based optimization for restaurant assignments."""
 
-import numpy as np
-from scipy.optimize import LinearConstraint, milp
-
-from dineassign.models import Assignment, Diner, OptimizationResult, Reservation
-from dineassign.normalize import get_aggregate_preferences, normalize_preferences
+import os
+from collections import Counter
+from functools import cache
+from itertools import combinations, groupby
+from typing import TYPE_CHECKING
 
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import coo_matrix
 
-def _var_index(
-    e_idx: int,
-    r_idx: int,
-    d_idx: int,
-    num_restaurants: int,
-    num_days: int,
-) -> int:
-    """Convert (diner, restaurant, day) indices to flat variable index."""
-    return e_idx * (num_restaurants * num_days) + r_idx * num_days + d_idx
+try:
+    import highspy
+except ImportError:  # Optional; scipy.optimize.milp wraps the same solver
+    highspy = None
 
+from dineassign.models import Assignment, Diner, OptimizationResult, Reservation
+from dineassign.normalize import get_aggregate_preferences, normalize_preference_matrix
 
-def _pair_index(e1_idx: int, e2_idx: int, num_diners: int) -> int:
-    """Convert ordered pair (e1, e2) with e1 < e2 to flat pair index."""
-    return e1_idx * num_diners - (e1_idx * (e1_idx + 1)) // 2 + (e2_idx - e1_idx - 1)
+if TYPE_CHECKING:
+    from highspy import Highs
 
 
 def optimize_assignments(
@@ -32,10 +31,14 @@ def optimize_assignments(
     max_group_size: int = 8,
     one_shot: bool = False,
     diversity_weight: float | None = None,
+    previous_result: OptimizationResult | None = None,
 ) -> OptimizationResult:
     """
     Optimize restaurant assignments using Integer Linear Programming.
 
+    previous_result, typically the plan from before the latest reservation
+    changes, seeds the solver with a starting solution when it is still feasible.
+
     Returns an OptimizationResult with assignments, total satisfaction,
     and a suggested next reservation if applicable.
     """
@@ -44,35 +47,48 @@ def optimize_assignments(
     num_days = len(days)
     num_assignment_vars = num_diners * num_restaurants * num_days
 
+    # Assignment variable x[e,r,d] lives at e * diner_stride + r * num_days + d
+    diner_stride = num_restaurants * num_days
+
     # In one-shot mode, add indicator variables for (restaurant, day) slots
     # y_{r,d} = 1 if restaurant r is used on day d, 0 otherwise
     num_indicator_vars = num_restaurants * num_days if one_shot else 0
 
+    # Normalize preferences as a (diner, restaurant) matrix; -inf marks "Can't eat"
+    pref_matrix = normalize_preference_matrix(diners, restaurants)
+    cant_eat = np.isneginf(pref_matrix)
+
+    # Per-restaurant reductions, shared by both reservation-suggestion call sites
+    can_eat_count = (~cant_eat).sum(axis=0)
+    aggregates = get_aggregate_preferences(pref_matrix)
+
+    # Diversity penalty weight
+    # Auto-compute weight if not specified: 10% of mean absolute preference
+    if diversity_weight is None:
+        valid_prefs = pref_matrix[~cant_eat]
+        mean_abs_pref = float(np.abs(valid_prefs).mean()) if valid_prefs.size > 0 else 1.0
+        lambda_diversity = 0.1 * mean_abs_pref
+    else:
+        lambda_diversity = diversity_weight
+
+    # Repeated pairings need at least two days and a nonzero penalty to matter;
+    # otherwise skip the (quadratic in diners) diversity variables entirely
+    diversity_enabled = num_days >= 2 and lambda_diversity != 0
+
     # Diversity variables: track which diner pairs dine together
-    # both[e1,e2,r,d] = 1 iff both e1 and e2 are at restaurant r on day d
+    # together[e1,e2,d] = 1 if e1 and e2 share a restaurant on day d
     # overlap[e1,e2] = 1 iff e1 and e2 dine together on 2+ days
-    num_pairs = num_diners * (num_diners - 1) // 2
-    num_both_vars = num_pairs * num_restaurants * num_days
+    num_pairs = num_diners * (num_diners - 1) // 2 if diversity_enabled else 0
+    num_together_vars = num_pairs * num_days
     num_overlap_vars = num_pairs
-    num_diversity_vars = num_both_vars + num_overlap_vars
+    num_diversity_vars = num_together_vars + num_overlap_vars
 
     num_vars = num_assignment_vars + num_indicator_vars + num_diversity_vars
 
-    # Variable offset helpers
+    # Variable offset helpers. Diversity variables follow the indicators:
+    # together[pair, d] at diversity_offset + pair * num_days + d, then overlap[pair]
     diversity_offset = num_assignment_vars + num_indicator_vars
 
-    def _indicator_index(r_idx: int, d_idx: int) -> int:
-        return num_assignment_vars + r_idx * num_days + d_idx
-
-    def _both_index(pair_idx: int, r_idx: int, d_idx: int) -> int:
-        return diversity_offset + pair_idx * (num_restaurants * num_days) + r_idx * num_days + d_idx
-
-    def _overlap_index(pair_idx: int) -> int:
-        return diversity_offset + num_both_vars + pair_idx
-
-    # Normalize preferences
-    normalized_prefs = normalize_preferences(diners, restaurants)
-
     # Build restaurant/day -> reservation lookup
     confirmed_reservations: dict[tuple[str, str], Reservation] = {}
     unavailable: set[tuple[str, str]] = set()
@@ -83,191 +99,331 @@ def optimize_assignments(
         elif res.status == "unavailable":
             unavailable.add(key)
 
+    # Slots that can take diners: confirmed reservations, or in one-shot mode any
+    # slot not marked unavailable where enough diners can eat to reach
+    # min_group_size. Nobody can be assigned to the others.
+    slot_open = np.array(
+        [
+            [
+                (restaurant, day) in confirmed_reservations
+                or (
+                    one_shot
+                    and (restaurant, day) not in unavailable
+                    and can_eat_count[r_idx] >= min_group_size
+                )
+                for day in days
+            ]
+            for r_idx, restaurant in enumerate(restaurants)
+        ],
+        dtype=bool,
+    ).reshape(num_restaurants, num_days)
+
+    # x[e,r,d] can only be 1 where the diner can eat and the slot is open; every
+    # other assignment variable is fixed to 0 (Constraint 4) and left out of rows
+    usable = ~cant_eat[:, :, None] & slot_open[None, :, :]
+
     # Build objective: maximize satisfaction (negate for minimization)
+    # Variables are laid out diner-major then restaurant then day, so each (e, r)
+    # coefficient repeats num_days times. Can't eat cells are fixed to 0 by their
+    # bounds, so their coefficient is irrelevant.
     c = np.zeros(num_vars)
-    pref_sum = 0.0
-    pref_count = 0
-    for e_idx, diner in enumerate(diners):
-        for r_idx, restaurant in enumerate(restaurants):
-            pref = normalized_prefs[diner.email][restaurant]
-            for d_idx in range(num_days):
-                var_idx = _var_index(e_idx, r_idx, d_idx, num_restaurants, num_days)
-                if pref == float("-inf"):
-                    # Can't eat here - set very negative coefficient
-                    c[var_idx] = 1e6  # Large penalty (we're minimizing -satisfaction)
-                else:
-                    c[var_idx] = -pref  # Negate because milp minimizes
-                    pref_sum += abs(pref)
-                    pref_count += 1
-
-    # Add diversity penalty to objective
-    # Auto-compute weight if not specified: 10% of mean absolute preference
-    if diversity_weight is None:
-        mean_abs_pref = pref_sum / pref_count if pref_count > 0 else 1.0
-        lambda_diversity = 0.1 * mean_abs_pref
-    else:
-        lambda_diversity = diversity_weight
+    coeffs = np.where(cant_eat, 0.0, -pref_matrix)
+    c[:num_assignment_vars] = np.repeat(coeffs.ravel(), num_days)
 
     # Set coefficients for overlap variables (penalize repeated pairings)
-    for pair_idx in range(num_pairs):
-        c[_overlap_index(pair_idx)] = lambda_diversity
-
-    # Build constraints
-    A_eq_rows: list[np.ndarray] = []
-    b_eq: list[float] = []
-    A_ub_rows: list[np.ndarray] = []
-    b_ub: list[float] = []
+    c[diversity_offset + num_together_vars :] = lambda_diversity
+
+    # Build constraints as sparse COO triplets (row, col, value); each row only
+    # touches a handful of the num_vars columns and is bounded by
+    # row_lower <= row <= row_upper (equal bounds for equality rows). Every
+    # constraint family is emitted as whole arrays; the blocks are concatenated
+    # once, into arrays of exactly the total size, when the matrix is built.
+    coo_rows: list[np.ndarray] = []
+    coo_cols: list[np.ndarray] = []
+    coo_vals: list[np.ndarray] = []
+    row_lower: list[np.ndarray] = []
+    row_upper: list[np.ndarray] = []
+    num_rows = 0
+
+    def _add_rows(
+        num_new_rows: int,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        vals: np.ndarray | float,
+        lower: np.ndarray | float,
+        upper: np.ndarray | float,
+    ) -> None:
+        """Append num_new_rows rows given as COO entries (rows relative to the first)."""
+        nonlocal num_rows
+        coo_rows.append(rows + num_rows)
+        coo_cols.append(cols)
+        coo_vals.append(np.broadcast_to(vals, cols.shape))
+        row_lower.append(np.broadcast_to(lower, num_new_rows))
+        row_upper.append(np.broadcast_to(upper, num_new_rows))
+        num_rows += num_new_rows
+
+    def _add_ub_block(cols: np.ndarray, vals: np.ndarray, rhs: float) -> None:
+        """Append one <= rhs row per row of the 2-D cols array, sharing vals."""
+        num_block_rows, width = cols.shape
+        block_rows = np.repeat(np.arange(num_block_rows), width)
+        _add_rows(
+            num_block_rows, block_rows, cols.ravel(), np.tile(vals, num_block_rows), -np.inf, rhs
+        )
 
     # Constraint 1: Each diner at exactly one restaurant per day
-    for e_idx in range(num_diners):
-        for d_idx in range(num_days):
-            row = np.zeros(num_vars)
-            for r_idx in range(num_restaurants):
-                var_idx = _var_index(e_idx, r_idx, d_idx, num_restaurants, num_days)
-                row[var_idx] = 1.0
-            A_eq_rows.append(row)
-            b_eq.append(1.0)
+    # One row per (e, d), numbered e * num_days + d, over the usable restaurants
+    e_arr, d_arr, r_arr = np.nonzero(usable.transpose(0, 2, 1))
+    _add_rows(
+        num_diners * num_days,
+        e_arr * num_days + d_arr,
+        e_arr * diner_stride + r_arr * num_days + d_arr,
+        1.0,
+        1.0,
+        1.0,
+    )
 
     # Constraint 2: Each diner at each restaurant at most once across all days
-    for e_idx in range(num_diners):
-        for r_idx in range(num_restaurants):
-            row = np.zeros(num_vars)
-            for d_idx in range(num_days):
-                var_idx = _var_index(e_idx, r_idx, d_idx, num_restaurants, num_days)
-                row[var_idx] = 1.0
-            A_ub_rows.append(row)
-            b_ub.append(1.0)
-
-    # Constraint 3: Group size bounds for confirmed reservations
+    # (only needed where the diner could be seated there on two or more days).
+    # One row per such (e, r) in diner-major order, over its usable days. Models
+    # without one-shot indicators or diversity variables add these rows lazily
+    # (see below); integer programs get them up front.
+    repeatable = usable.sum(axis=2) >= 2
+    lazy_once_rows = not one_shot and not diversity_enabled
+
+    def _add_once_rows() -> None:
+        pair_row = np.cumsum(repeatable.ravel()) - 1
+        e_arr, r_arr, d_arr = np.nonzero(usable & repeatable[:, :, None])
+        _add_rows(
+            int(repeatable.sum()),
+            pair_row[e_arr * num_restaurants + r_arr],
+            e_arr * diner_stride + r_arr * num_days + d_arr,
+            1.0,
+            -np.inf,
+            1.0,
+        )
+
+    if not lazy_once_rows:
+        _add_once_rows()
+
+    # Constraint 3: Group size bounds for open slots, two rows per slot
     # For restaurants with confirmed reservations: min_size <= sum <= capacity
-    # For restaurants without: sum = 0 (nobody can be assigned there yet)
-    # For one-shot mode: either sum = 0 OR min_size <= sum <= max_size
-    for r_idx, restaurant in enumerate(restaurants):
-        for d_idx, day in enumerate(days):
-            key = (restaurant, day)
-            row = np.zeros(num_vars)
-            for e_idx in range(num_diners):
-                var_idx = _var_index(e_idx, r_idx, d_idx, num_restaurants, num_days)
-                row[var_idx] = 1.0
-
-            if key in confirmed_reservations:
-                res = confirmed_reservations[key]
-                # sum >= min_group_size: -sum <= -min_group_size
-                A_ub_rows.append(-row)
-                b_ub.append(-min_group_size)
-                # sum <= capacity
-                A_ub_rows.append(row.copy())
-                b_ub.append(float(res.capacity))
-            elif key in unavailable:
-                # Unavailable - nobody can be assigned
-                A_eq_rows.append(row)
-                b_eq.append(0.0)
-            elif one_shot:
-                # One-shot: use indicator var y to model "sum=0 OR min<=sum<=max"
-                # sum <= max * y (if y=0, sum=0; if y=1, sum<=max)
-                # sum >= min * y (if y=0, sum>=0 trivially; if y=1, sum>=min)
-                y_idx = _indicator_index(r_idx, d_idx)
-                row_upper = row.copy()
-                row_upper[y_idx] = -max_group_size
-                A_ub_rows.append(row_upper)  # sum - max*y <= 0
-                b_ub.append(0.0)
-                row_lower = -row.copy()
-                row_lower[y_idx] = min_group_size
-                A_ub_rows.append(row_lower)  # -sum + min*y <= 0
-                b_ub.append(0.0)
-            else:
-                # No reservation - nobody can be assigned
-                A_eq_rows.append(row)
-                b_eq.append(0.0)
-
-    # Constraint 4: Hard exclusions (Can't eat here)
-    # Already handled via large penalty in objective, but add explicit bounds
+    #   -sum <= -min_group_size, then sum <= capacity
+    # For one-shot mode: either sum = 0 OR min_size <= sum <= max_size, modeled with
+    # the indicator y (if y=0, sum=0; if y=1, min<=sum<=max)
+    #   sum - M*y <= 0, then -sum + min*y <= 0
+    # The sum can never exceed the diners who can eat there, so M is that count
+    # when it is below max_group_size. Blocked slots (unavailable, or no
+    # reservation yet) need no row: their variables are fixed to 0 by Constraint 4.
+    slot_r, slot_d = np.nonzero(slot_open)
+    num_slots = len(slot_r)
+    # Offset of slot (r, d) within a diner's block, shared by x[., r, d] and y[r, d]
+    slot = slot_r * num_days + slot_d
+    slot_reservations = [
+        confirmed_reservations.get((restaurants[r], days[d]))
+        for r, d in zip(slot_r.tolist(), slot_d.tolist(), strict=True)
+    ]
+    confirmed_slot = np.array([res is not None for res in slot_reservations], dtype=bool)
+    capacity = np.array(
+        [res.capacity if res is not None else 0 for res in slot_reservations], dtype=np.float64
+    )
+    # Sign of the sum in each slot's first row (its second row has the opposite sign)
+    first_sign = np.where(confirmed_slot, -1.0, 1.0)
+
+    e_arr, k_arr = np.nonzero(usable[:, slot_r, slot_d])  # (diner, slot) entries
+    y_slots = np.flatnonzero(~confirmed_slot)
+    big_m = np.minimum(max_group_size, usable[:, slot_r, slot_d].sum(axis=0))
+    _add_rows(
+        2 * num_slots,
+        np.concatenate((2 * k_arr, 2 * k_arr + 1, 2 * y_slots, 2 * y_slots + 1)),
+        np.concatenate(
+            (
+                e_arr * diner_stride + slot[k_arr],  # x[e,r,d], first row
+                e_arr * diner_stride + slot[k_arr],  # x[e,r,d], second row
+                num_assignment_vars + slot[y_slots],  # y[r,d], first row
+                num_assignment_vars + slot[y_slots],  # y[r,d], second row
+            )
+        ),
+        np.concatenate(
+            (
+                first_sign[k_arr],
+                -first_sign[k_arr],
+                -big_m[y_slots].astype(np.float64),
+                np.full(len(y_slots), float(min_group_size)),
+            )
+        ),
+        -np.inf,
+        np.column_stack(
+            (
+                np.where(confirmed_slot, -min_group_size, 0.0),
+                np.where(confirmed_slot, capacity, 0.0),
+            )
+        ).ravel(),
+    )
+
+    # Constraint 4: Hard exclusions (Can't eat here) and blocked slots, fixed to 0
+    # via bounds so presolve removes them instead of carrying sum = 0 rows
     bounds_lower = np.zeros(num_vars)
     bounds_upper = np.ones(num_vars)  # All vars (assignment + indicator) are binary [0,1]
-    for e_idx, diner in enumerate(diners):
-        for r_idx, restaurant in enumerate(restaurants):
-            if normalized_prefs[diner.email][restaurant] == float("-inf"):
-                for d_idx in range(num_days):
-                    var_idx = _var_index(e_idx, r_idx, d_idx, num_restaurants, num_days)
-                    bounds_upper[var_idx] = 0.0  # Force to 0
-
-    # Constraint 5: Diversity - linearize "both" variables
-    # For each pair (e1, e2), restaurant r, day d:
-    # both[e1,e2,r,d] = x[e1,r,d] AND x[e2,r,d]
-    # Linearization: both <= x[e1,r,d], both <= x[e2,r,d], both >= x[e1,r,d] + x[e2,r,d] - 1
-    for e1_idx in range(num_diners):
-        for e2_idx in range(e1_idx + 1, num_diners):
-            pair_idx = _pair_index(e1_idx, e2_idx, num_diners)
-            for r_idx in range(num_restaurants):
-                for d_idx in range(num_days):
-                    both_idx = _both_index(pair_idx, r_idx, d_idx)
-                    x1_idx = _var_index(e1_idx, r_idx, d_idx, num_restaurants, num_days)
-                    x2_idx = _var_index(e2_idx, r_idx, d_idx, num_restaurants, num_days)
-
-                    # both <= x[e1,r,d]
-                    row = np.zeros(num_vars)
-                    row[both_idx] = 1.0
-                    row[x1_idx] = -1.0
-                    A_ub_rows.append(row)
-                    b_ub.append(0.0)
-
-                    # both <= x[e2,r,d]
-                    row = np.zeros(num_vars)
-                    row[both_idx] = 1.0
-                    row[x2_idx] = -1.0
-                    A_ub_rows.append(row)
-                    b_ub.append(0.0)
-
-                    # both >= x[e1,r,d] + x[e2,r,d] - 1  =>  -both + x1 + x2 <= 1
-                    row = np.zeros(num_vars)
-                    row[both_idx] = -1.0
-                    row[x1_idx] = 1.0
-                    row[x2_idx] = 1.0
-                    A_ub_rows.append(row)
-                    b_ub.append(1.0)
-
-    # Constraint 6: Diversity - overlap counting
-    # overlap[e1,e2] >= sum_r(both[e1,e2,r,d1]) + sum_r(both[e1,e2,r,d2]) - 1 for each day pair
-    # This penalizes pairs who dine together on multiple days
-    for e1_idx in range(num_diners):
-        for e2_idx in range(e1_idx + 1, num_diners):
-            pair_idx = _pair_index(e1_idx, e2_idx, num_diners)
-            overlap_idx = _overlap_index(pair_idx)
-
-            # For each pair of days, add overlap constraint
-            for d1_idx in range(num_days):
-                for d2_idx in range(d1_idx + 1, num_days):
-                    # -overlap + sum_r(both[d1]) + sum_r(both[d2]) <= 1
-                    row = np.zeros(num_vars)
-                    row[overlap_idx] = -1.0
-                    for r_idx in range(num_restaurants):
-                        row[_both_index(pair_idx, r_idx, d1_idx)] = 1.0
-                        row[_both_index(pair_idx, r_idx, d2_idx)] = 1.0
-                    A_ub_rows.append(row)
-                    b_ub.append(1.0)
-
-    # Convert to arrays
-    A_eq = np.array(A_eq_rows) if A_eq_rows else None
-    b_eq_arr = np.array(b_eq) if b_eq else None
-    A_ub = np.array(A_ub_rows) if A_ub_rows else None
-    b_ub_arr = np.array(b_ub) if b_ub else None
-
-    # Build constraints for milp
-    constraints = []
-    if A_eq is not None and b_eq_arr is not None:
-        constraints.append(LinearConstraint(A_eq, b_eq_arr, b_eq_arr))
-    if A_ub is not None and b_ub_arr is not None:
-        constraints.append(LinearConstraint(A_ub, -np.inf, b_ub_arr))
-
-    from scipy.optimize import Bounds
-
-    bounds = Bounds(bounds_lower, bounds_upper)
-    integrality = np.ones(num_vars, dtype=np.intp)  # All binary
-
-    # Solve
-    result = milp(c, constraints=constraints, bounds=bounds, integrality=integrality)
-
-    if not result.success:
+    bounds_upper[:num_assignment_vars] = usable.ravel()
+    if one_shot:
+        bounds_upper[num_assignment_vars:diversity_offset] = slot_open.ravel()
+
+    # Constraints 5-6 only exist when diversity is enabled (num_pairs > 0). They
+    # make up the bulk of the model, so their indices are computed as whole arrays
+    # (pairs (e1, e2) with e1 < e2 enumerated in row-major upper-triangle order).
+    if diversity_enabled:
+        pair_e1, pair_e2 = np.triu_indices(num_diners, k=1)
+        pair_ids = np.arange(num_pairs)
+        # Every Constraint 5-6 row has the form -aux + a + b <= 1
+        aux_coeffs = np.array([-1.0, 1.0, 1.0])
+
+        # Constraint 5: Diversity - pairs sharing a restaurant on a day
+        # together[e1,e2,d] >= x[e1,r,d] + x[e2,r,d] - 1 for each restaurant r.
+        # Only lower bounds are needed: together feeds the penalized overlap variable,
+        # so the solver never raises it above what the assignment forces.
+        # Restaurants where either diner is fixed to 0 need no row.
+        both_usable = usable[pair_e1] & usable[pair_e2]  # (pair, restaurant, day)
+        p_arr, d_arr, r_arr = np.nonzero(both_usable.transpose(0, 2, 1))
+        x_offset = r_arr * num_days + d_arr
+        _add_ub_block(
+            np.column_stack(
+                (
+                    diversity_offset + p_arr * num_days + d_arr,  # together[e1,e2,d]
+                    pair_e1[p_arr] * diner_stride + x_offset,  # x[e1,r,d]
+                    pair_e2[p_arr] * diner_stride + x_offset,  # x[e2,r,d]
+                )
+            ),
+            aux_coeffs,
+            1.0,
+        )
+
+        # Constraint 6: Diversity - overlap counting
+        # overlap[e1,e2] >= together[e1,e2,d1] + together[e1,e2,d2] - 1 for each day pair
+        # This penalizes pairs who dine together on multiple days
+        day1, day2 = np.triu_indices(num_days, k=1)
+        together_base = (diversity_offset + pair_ids * num_days)[:, None]
+        _add_ub_block(
+            np.column_stack(
+                (
+                    np.repeat(diversity_offset + num_together_vars + pair_ids, len(day1)),
+                    (together_base + day1).ravel(),
+                    (together_base + day2).ravel(),
+                )
+            ),
+            aux_coeffs,
+            1.0,
+        )
+
+    # Constraint 7: Symmetry breaking - diners with identical preference rows are
+    # interchangeable, so keep only the solutions where, within each such class,
+    # first-day restaurant indices are non-decreasing in diner order:
+    # sum_r r * x[e_i,r,0] - sum_r r * x[e_j,r,0] <= 0 for consecutive members e_i < e_j.
+    # This prunes equivalent branches from branch-and-bound; the transportation LP
+    # has none and must keep its structure, so it gets no such rows.
+    symmetry_classes: list[np.ndarray] = []
+    if not lazy_once_rows and num_days > 0:
+        _, pref_class = np.unique(pref_matrix, axis=0, return_inverse=True)
+        pref_class = pref_class.ravel()
+        by_class = np.argsort(pref_class, kind="stable")
+        class_starts = np.flatnonzero(np.diff(pref_class[by_class])) + 1
+        symmetry_classes = [c for c in np.split(by_class, class_starts) if len(c) > 1]
+
+        same_class = pref_class[by_class[:-1]] == pref_class[by_class[1:]]
+        twin_a, twin_b = by_class[:-1][same_class], by_class[1:][same_class]
+        # Identical rows share their usable restaurants; r = 0 has a zero coefficient
+        p_arr, r_arr = np.nonzero(usable[twin_a, 1:, 0])
+        r_arr += 1
+        _add_rows(
+            len(twin_a),
+            np.concatenate((p_arr, p_arr)),
+            np.concatenate(
+                (
+                    twin_a[p_arr] * diner_stride + r_arr * num_days,  # x[e_i,r,0]
+                    twin_b[p_arr] * diner_stride + r_arr * num_days,  # x[e_j,r,0]
+                )
+            ),
+            np.concatenate((r_arr, -r_arr)),
+            -np.inf,
+            0.0,
+        )
+
+    # Warm start: complete the previous assignments into a full start vector. The
+    # indicator and diversity variables follow from x, taking the smallest values
+    # Constraints 3 and 5-6 allow.
+    start = None
+    seated = _previous_assignments(previous_result, diners, restaurants, days)
+    if seated is not None:
+        # Reorder each symmetry class's schedules to satisfy Constraint 7
+        for members in symmetry_classes:
+            first_day = seated[members, :, 0].argmax(axis=1)
+            seated[members] = seated[members[np.argsort(first_day, kind="stable")]]
+        start = np.zeros(num_vars)
+        start[:num_assignment_vars] = seated.ravel()
+        if one_shot:
+            start[num_assignment_vars:diversity_offset] = seated.any(axis=0).ravel()
+        if diversity_enabled:
+            together = (seated[pair_e1] & seated[pair_e2]).any(axis=1)  # (pair, day)
+            start[diversity_offset : diversity_offset + num_together_vars] = together.ravel()
+            start[diversity_offset + num_together_vars :] = together.sum(axis=1) >= 2
+        if (start > bounds_upper).any():
+            # The previous plan uses a slot that has since been blocked
+            start = None
+
+    # Eliminate the variables Constraint 4 fixes to 0 instead of leaving them to
+    # presolve. No row references them, so the solver only sees the active
+    # columns (renumbered in order) and the solution is scattered back below.
+    active_idx = np.flatnonzero(bounds_upper > 0)
+    active_col = np.cumsum(bounds_upper > 0) - 1
+    c_active = c[active_idx]
+    col_lower = bounds_lower[active_idx]
+    col_upper = bounds_upper[active_idx]
+    start_active = start[active_idx] if start is not None else None
+
+    def _solve(integer: bool) -> np.ndarray | None:
+        A = coo_matrix(
+            (
+                np.concatenate(coo_vals),
+                (np.concatenate(coo_rows), active_col[np.concatenate(coo_cols)]),
+            ),
+            shape=(num_rows, active_idx.size),
+        )
+        return _solve_milp(
+            c_active,
+            A,
+            np.concatenate(row_lower),
+            np.concatenate(row_upper),
+            col_lower,
+            col_upper,
+            integer=integer,
+            start=start_active,
+        )
+
+    def _integral(x_active: np.ndarray) -> bool:
+        return np.allclose(x_active, np.rint(x_active), atol=1e-6)
+
+    # Without one-shot indicators, diversity variables, or Constraint 2 rows, each
+    # assignment variable sits in exactly one diner-day row and one slot row. That
+    # bipartite transportation structure is totally unimodular, so the LP relaxation
+    # already has an integral optimal vertex and branch-and-bound can be skipped.
+    # Constraint 2 is generated lazily on top of it: an integral LP solution that
+    # seats nobody at the same restaurant twice is optimal for the full model.
+    # Otherwise all Constraint 2 rows are added and the LP is solved again, which
+    # is usually still integral; only a fractional optimum falls back to the
+    # integer program.
+    x_active = _solve(integer=not lazy_once_rows)
+    if lazy_once_rows and x_active is not None:
+        x = np.zeros(num_vars)
+        x[active_idx] = x_active
+        per_restaurant = x[:num_assignment_vars].reshape(num_diners, num_restaurants, num_days)
+        repeated = (per_restaurant.sum(axis=2) > 1 + 1e-6).any()
+        if repeatable.any() and (repeated or not _integral(x_active)):
+            _add_once_rows()
+            x_active = _solve(integer=False)
+        if x_active is not None and not _integral(x_active):
+            # Fractional (non-vertex) LP optimum; fall back to the integer program
+            x_active = _solve(integer=True)
+
+    if x_active is None:
         # Try to provide useful feedback
         return OptimizationResult(
             assignments=[],
@@ -278,59 +434,46 @@ def optimize_assignments(
                 days,
                 confirmed_reservations,
                 unavailable,
-                normalized_prefs,
+                aggregates,
+                can_eat_count,
                 min_group_size,
                 max_group_size,
             ),
         )
 
-    # Extract assignments
-    assert result.x is not None  # Guaranteed by result.success check above
-    x = result.x
-    assignments: list[Assignment] = []
-    total_satisfaction = 0.0
-
-    for e_idx, diner in enumerate(diners):
-        for r_idx, restaurant in enumerate(restaurants):
-            for d_idx, day in enumerate(days):
-                var_idx = _var_index(e_idx, r_idx, d_idx, num_restaurants, num_days)
-                if x[var_idx] > 0.5:  # Binary, so check > 0.5
-                    pref_score = normalized_prefs[diner.email][restaurant]
-                    assignments.append(
-                        Assignment(
-                            diner_email=diner.email,
-                            restaurant=restaurant,
-                            day=day,
-                            preference_score=pref_score if pref_score != float("-inf") else 0.0,
-                        )
-                    )
-                    if pref_score != float("-inf"):
-                        total_satisfaction += pref_score
-
-    # Count repeated pairings from actual assignments (more accurate than overlap vars)
-    day_groups: dict[str, set[frozenset[str]]] = {}
-    for day in days:
-        day_assignments = [a for a in assignments if a.day == day]
-        restaurants_on_day: dict[str, set[str]] = {}
-        for a in day_assignments:
-            if a.restaurant not in restaurants_on_day:
-                restaurants_on_day[a.restaurant] = set()
-            restaurants_on_day[a.restaurant].add(a.diner_email)
-        day_groups[day] = set()
-        for diner_set in restaurants_on_day.values():
-            for e1 in diner_set:
-                for e2 in diner_set:
-                    if e1 < e2:
-                        day_groups[day].add(frozenset([e1, e2]))
-
-    # Count pairs that appear together on 2+ days
-    repeated_pairings = 0
-    if len(days) >= 2:
-        all_pairs = set.union(*day_groups.values()) if day_groups else set()
-        for pair in all_pairs:
-            days_together = sum(1 for d in days if pair in day_groups.get(d, set()))
-            if days_together >= 2:
-                repeated_pairings += 1
+    x = np.zeros(num_vars)
+    x[active_idx] = x_active
+
+    # Extract assignments: decode only the chosen (diner, restaurant, day) cells
+    # (nonzero on the (E, R, D) view yields them in variable order). Binary, so check > 0.5
+    chosen = x[:num_assignment_vars].reshape(num_diners, num_restaurants, num_days) > 0.5
+    e_idx, r_idx, d_idx = np.nonzero(chosen)
+    # "Can't eat" cells are fixed to 0, but guard against -inf scores regardless
+    chosen_scores = np.where(cant_eat[e_idx, r_idx], 0.0, pref_matrix[e_idx, r_idx]).tolist()
+
+    assignments = [
+        Assignment(
+            diner_email=diners[e].email,
+            restaurant=restaurants[r],
+            day=days[d],
+            preference_score=score,
+        )
+        for e, r, d, score in zip(
+            e_idx.tolist(), r_idx.tolist(), d_idx.tolist(), chosen_scores, strict=True
+        )
+    ]
+    total_satisfaction = float(sum(chosen_scores))
+
+    # Count repeated pairings from actual assignments (more accurate than overlap vars):
+    # one pass over the assignments grouped by (day, restaurant) table
+    def slot_key(a: Assignment) -> tuple[str, str]:
+        return (a.day, a.restaurant)
+
+    pair_counts: Counter[tuple[str, str]] = Counter()
+    for _, group in groupby(sorted(assignments, key=slot_key), key=slot_key):
+        # A diner sits at one table per day, so each pair is counted at most once per day
+        pair_counts.update(combinations(sorted(a.diner_email for a in group), 2))
+    repeated_pairings = sum(1 for count in pair_counts.values() if count >= 2)
 
     # Suggest next reservation
     suggested = _suggest_reservation(
@@ -339,7 +482,8 @@ def optimize_assignments(
         days,
         confirmed_reservations,
         unavailable,
-        normalized_prefs,
+        aggregates,
+        can_eat_count,
         min_group_size,
         max_group_size,
     )
@@ -352,27 +496,145 @@ def optimize_assignments(
     )
 
 
+def _solve_milp(
+    c: np.ndarray,
+    A: coo_matrix,
+    row_lower: np.ndarray,
+    row_upper: np.ndarray,
+    col_lower: np.ndarray,
+    col_upper: np.ndarray,
+    integer: bool = True,
+    start: np.ndarray | None = None,
+) -> np.ndarray | None:
+    """
+    Minimize c @ x over integer x with row_lower <= A @ x <= row_upper.
+
+    With integer=False only the LP relaxation is solved. Calls HiGHS directly
+    through highspy when it is installed (multi-threaded, no LinearConstraint
+    repacking), otherwise scipy.optimize.milp, which bundles the same solver.
+    start is an optional MIP starting solution; only the highspy path can use
+    it (HiGHS discards it if infeasible), scipy.optimize.milp solves cold.
+    Returns the solution, or None if no optimal one was found.
+    """
+    num_vars = len(c)
+    if num_vars == 0:
+        # Every variable was eliminated; scipy rejects an empty model, so check the
+        # (now constant) rows directly
+        feasible = np.all((row_lower <= 0) & (row_upper >= 0))
+        return np.zeros(0) if feasible else None
+
+    if highspy is None:
+        constraints = [LinearConstraint(A.tocsr(), row_lower, row_upper)] if A.shape[0] else []
+        result = milp(
+            c,
+            constraints=constraints,
+            bounds=Bounds(col_lower, col_upper),
+            integrality=np.full(num_vars, int(integer), dtype=np.intp),
+            options={"presolve": True, "disp": False},
+        )
+        return result.x if result.success else None
+
+    A_csc = A.tocsc()
+    lp = highspy.HighsLp()
+    lp.num_col_ = num_vars
+    lp.num_row_ = A_csc.shape[0]
+    lp.sense_ = highspy.ObjSense.kMinimize
+    lp.col_cost_ = c
+    lp.col_lower_ = col_lower
+    lp.col_upper_ = col_upper
+    lp.row_lower_ = row_lower
+    lp.row_upper_ = row_upper
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    lp.a_matrix_.num_col_ = num_vars
+    lp.a_matrix_.num_row_ = A_csc.shape[0]
+    lp.a_matrix_.start_ = A_csc.indptr.astype(np.int32, copy=False)
+    lp.a_matrix_.index_ = A_csc.indices.astype(np.int32, copy=False)
+    lp.a_matrix_.value_ = A_csc.data
+    if integer:
+        # Left empty, every column is continuous
+        lp.integrality_ = [highspy.HighsVarType.kInteger] * num_vars
+
+    h = _highs()
+    h.clearModel()
+    h.passModel(lp)
+    if start is not None and integer:
+        warm = highspy.HighsSolution()
+        warm.col_value = start.tolist()
+        warm.value_valid = True
+        h.setSolution(warm)
+    h.run()
+    if h.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+        return None
+    return np.array(h.getSolution().col_value)
+
+
+@cache
+def _highs() -> "Highs":
+    """
+    Return the process-wide HiGHS instance, created and configured on first use.
+
+    Reusing one instance keeps its options and thread pool alive across solves
+    (the transportation LP and its MILP fallback, or repeated optimize_assignments
+    calls in one process); callers clear the previous model before passing a new one.
+    """
+    assert highspy is not None  # Only reached from the highspy branch of _solve_milp
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", False)
+    h.setOptionValue("presolve", "on")
+    h.setOptionValue("parallel", "on")
+    h.setOptionValue("threads", os.cpu_count() or 1)
+    return h
+
+
+def _previous_assignments(
+    previous_result: OptimizationResult | None,
+    diners: list[Diner],
+    restaurants: list[str],
+    days: list[str],
+) -> np.ndarray | None:
+    """
+    Map a previous result's assignments onto an (E, R, D) boolean array.
+
+    Returns None when there is nothing to reuse, or when the previous result
+    names a diner, restaurant or day that is not part of this problem.
+    """
+    if previous_result is None or not previous_result.assignments:
+        return None
+
+    diner_idx = {diner.email: i for i, diner in enumerate(diners)}
+    restaurant_idx = {restaurant: i for i, restaurant in enumerate(restaurants)}
+    day_idx = {day: i for i, day in enumerate(days)}
+
+    seated = np.zeros((len(diners), len(restaurants), len(days)), dtype=bool)
+    for a in previous_result.assignments:
+        if (
+            a.diner_email not in diner_idx
+            or a.restaurant not in restaurant_idx
+            or a.day not in day_idx
+        ):
+            return None
+        seated[diner_idx[a.diner_email], restaurant_idx[a.restaurant], day_idx[a.day]] = True
+    return seated
+
+
 def _suggest_reservation(
     diners: list[Diner],
     restaurants: list[str],
     days: list[str],
     confirmed: dict[tuple[str, str], Reservation],
     unavailable: set[tuple[str, str]],
-    normalized_prefs: dict[str, dict[str, float]],
+    aggregates: np.ndarray,
+    can_eat_count: np.ndarray,
     min_group_size: int,
     max_group_size: int,
 ) -> tuple[str, str, int] | None:
-    """Suggest the next reservation to make."""
-    num_diners = len(diners)
-
-    # Count how many diners can eat at each restaurant (not "Can't eat")
-    can_eat_count: dict[str, int] = {}
-    for restaurant in restaurants:
-        count = sum(1 for prefs in normalized_prefs.values() if prefs[restaurant] != float("-inf"))
-        can_eat_count[restaurant] = count
+    """
+    Suggest the next reservation to make.
 
-    # Get aggregate preferences
-    aggregates = get_aggregate_preferences(normalized_prefs, restaurants)
+    aggregates and can_eat_count are per-restaurant arrays (in restaurant order) of
+    summed normalized preferences and of diners who can eat there.
+    """
+    num_diners = len(diners)
 
     # Count current capacity per day
     day_capacity: dict[str, int] = {day: 0 for day in days}
@@ -394,26 +656,29 @@ def _suggest_reservation(
     # Sort by most capacity needed
     days_needing_capacity.sort(key=lambda x: -x[1])
 
-    # Find best (restaurant, day) combination
-    best: tuple[str, str, int] | None = None
-    best_score = float("-inf")
-
-    for day, capacity_needed in days_needing_capacity:
-        for restaurant in restaurants:
-            key = (restaurant, day)
-            if key in confirmed or key in unavailable:
-                continue
-
-            # Skip if not enough people can eat there
-            if can_eat_count[restaurant] < min_group_size:
-                continue
-
-            # Score = aggregate preference + bonus for capacity fit
-            score = aggregates[restaurant]
-            suggested_capacity = min(max_group_size, capacity_needed, can_eat_count[restaurant])
-
-            if score > best_score and suggested_capacity >= min_group_size:
-                best_score = score
-                best = (restaurant, day, suggested_capacity)
+    # Score all (day, restaurant) candidates at once. Rows follow the sorted days and
+    # argmax returns the first maximum, so ties still go to the neediest day first
+    # and then to the earliest restaurant.
+    candidate_days = [day for day, _ in days_needing_capacity]
+    capacity_needed = np.array([needed for _, needed in days_needing_capacity])
+    suggested_capacity = np.minimum(
+        np.minimum(capacity_needed, max_group_size)[:, None], can_eat_count[None, :]
+    )
 
-    return best
+    # Skip slots already confirmed or unavailable
+    restaurant_col = {restaurant: r_idx for r_idx, restaurant in enumerate(restaurants)}
+    day_row = {day: d_idx for d_idx, day in enumerate(candidate_days)}
+    booked = np.zeros(suggested_capacity.shape, dtype=bool)
+    for restaurant, day in (*confirmed, *unavailable):
+        if restaurant in restaurant_col and day in day_row:
+            booked[day_row[day], restaurant_col[restaurant]] = True
+
+    # Skip if not enough people can eat there
+    eligible = ~booked & (can_eat_count >= min_group_size) & (suggested_capacity >= min_group_size)
+    if not eligible.any():
+        return None
+
+    # Score = aggregate preference of the restaurant
+    scores = np.where(eligible, aggregates, -np.inf)
+    d_idx, r_idx = np.unravel_index(np.argmax(scores), scores.shape)
+    return (restaurants[r_idx], candidate_days[d_idx], int(suggested_capacity[d_idx, r_idx]))
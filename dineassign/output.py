@@ -1,6 +1,9 @@
 """Output formatting for dineassign."""
 
+import io
 from collections import defaultdict
+from itertools import chain
+from operator import itemgetter
 
 from dineassign.models import Diner, OptimizationResult
 from dineassign.parser import LIKERT_LABELS
@@ -12,7 +15,11 @@ def format_results(
     diners: list[Diner] | None = None,
 ) -> str:
     """Format optimization results for display."""
-    lines: list[str] = []
+    buf = io.StringIO()
+
+    def emit(line: str = "") -> None:
+        buf.write(line)
+        buf.write("\n")
 
     # Build lookup for diner preferences
     diner_by_email: dict[str, Diner] = {}
@@ -20,30 +27,35 @@ def format_results(
         diner_by_email = {d.email: d for d in diners}
 
     if not result.assignments:
-        lines.append("No assignments could be made.")
-        lines.append("This may be because there are no confirmed reservations yet.")
+        emit("No assignments could be made.")
+        emit("This may be because there are no confirmed reservations yet.")
     else:
-        lines.append("=== Restaurant Assignments ===")
-        lines.append(f"Total satisfaction score: {result.total_satisfaction:.2f}")
-        lines.append(f"Repeated pairings: {result.repeated_pairings}")
-        lines.append("")
+        emit("=== Restaurant Assignments ===")
+        emit(f"Total satisfaction score: {result.total_satisfaction:.2f}")
+        emit(f"Repeated pairings: {result.repeated_pairings}")
+        emit()
+
+        # Display name (email local part) per diner, computed once rather than per day
+        name_by_email = {
+            email: email.partition("@")[0]
+            for email in {assignment.diner_email for assignment in result.assignments}
+        }
 
         # Group by day and restaurant, storing (name, email) tuples
         by_day_restaurant: dict[str, dict[str, list[tuple[str, str]]]] = defaultdict(
             lambda: defaultdict(list)
         )
         for assignment in result.assignments:
-            name = assignment.diner_email.split("@")[0]
             by_day_restaurant[assignment.day][assignment.restaurant].append(
-                (name, assignment.diner_email)
+                (name_by_email[assignment.diner_email], assignment.diner_email)
             )
 
         for day in days:
             if day not in by_day_restaurant:
                 continue
-            lines.append(f"--- {day.title()} ---")
+            emit(f"--- {day.title()} ---")
             for restaurant, assigned_diners in sorted(by_day_restaurant[day].items()):
-                lines.append(f"  {restaurant} ({len(assigned_diners)} diners):")
+                emit(f"  {restaurant} ({len(assigned_diners)} diners):")
                 for name, email in sorted(assigned_diners):
                     # Look up preference label if we have diner data
                     pref_suffix = ""
@@ -52,26 +64,27 @@ def format_results(
                         raw_pref = diner.preferences.get(restaurant)
                         label = LIKERT_LABELS.get(raw_pref, "Neutral")
                         pref_suffix = f" ({label})"
-                    lines.append(f"    - {name}{pref_suffix}")
-            lines.append("")
+                    emit(f"    - {name}{pref_suffix}")
+            emit()
 
         # Add preference summary if we have diner data
         if diners:
-            lines.append(format_preference_summary(result, diners))
-            lines.append("")
+            emit(format_preference_summary(result, diners))
+            emit()
 
     # Suggestion
     if result.suggested_reservation:
         restaurant, day, capacity = result.suggested_reservation
-        lines.append("=== Next Reservation Suggestion ===")
-        lines.append(f"Restaurant: {restaurant}")
-        lines.append(f"Day: {day.title()}")
-        lines.append(f"Suggested party size: {capacity}")
+        emit("=== Next Reservation Suggestion ===")
+        emit(f"Restaurant: {restaurant}")
+        emit(f"Day: {day.title()}")
+        emit(f"Suggested party size: {capacity}")
     elif result.assignments:
-        lines.append("=== All reservations complete ===")
-        lines.append("No additional reservations needed.")
+        emit("=== All reservations complete ===")
+        emit("No additional reservations needed.")
 
-    return "\n".join(lines)
+    # Every line ends in a newline; drop the last to match "\n".join(lines)
+    return buf.getvalue().removesuffix("\n")
 
 
 def format_preference_summary(
@@ -93,19 +106,26 @@ def format_preference_summary(
     for asn in result.assignments:
         assignments_by_diner[asn.diner_email].append(asn.restaurant)
 
-    # Build rows: (name, [(assigned, total) for each category])
+    # Build rows: (name, [(assigned, total) for each category]), sorted by name
+    named_diners = sorted(
+        ((diner.email.partition("@")[0], diner) for diner in diners), key=itemgetter(0)
+    )
     rows: list[tuple[str, list[tuple[int, int]]]] = []
-    for diner in sorted(diners, key=lambda d: d.email.split("@")[0]):
-        name = diner.email.split("@")[0]
+    for name, diner in named_diners:
         assigned_restaurants = set(assignments_by_diner.get(diner.email, []))
 
+        # Group restaurants by rating in one pass instead of rescanning per category
+        by_score: dict[int | None, list[str]] = defaultdict(list)
+        for restaurant, pref in diner.preferences.items():
+            by_score[pref].append(restaurant)
+
         cat_stats: list[tuple[int, int]] = []
         for score, _ in categories:
-            # Count restaurants rated in this category
-            rated = [r for r, pref in diner.preferences.items() if pref == score]
+            # Restaurants rated in this category
+            rated = by_score.get(score, [])
             total = len(rated)
             # Count how many of those were assigned
-            assigned = len([r for r in rated if r in assigned_restaurants])
+            assigned = sum(1 for r in rated if r in assigned_restaurants)
             cat_stats.append((assigned, total))
 
         rows.append((name, cat_stats))
@@ -135,18 +155,18 @@ def format_preference_summary(
 
 def format_assignments_csv(result: OptimizationResult, days: list[str]) -> str:
     """Format assignments as CSV for export."""
-    lines: list[str] = ["diner,day,restaurant,preference_score"]
-
-    # Sort by day, then restaurant, then diner
+    # Sort by day, then restaurant, then diner (days not in the list go last)
+    day_order: dict[str, int] = {}
+    for i, day in enumerate(days):
+        day_order.setdefault(day, i)  # First occurrence wins, as with days.index
     sorted_assignments = sorted(
         result.assignments,
-        key=lambda a: (days.index(a.day) if a.day in days else 99, a.restaurant, a.diner_email),
+        key=lambda a: (day_order.get(a.day, len(days)), a.restaurant, a.diner_email),
     )
 
-    for assignment in sorted_assignments:
-        lines.append(
-            f"{assignment.diner_email},{assignment.day},{assignment.restaurant},"
-            f"{assignment.preference_score:.3f}"
-        )
-
-    return "\n".join(lines)
+    rows = (
+        f"{assignment.diner_email},{assignment.day},{assignment.restaurant},"
+        f"{assignment.preference_score:.3f}"
+        for assignment in sorted_assignments
+    )
+    return "\n".join(chain(["diner,day,restaurant,preference_score"], rows))
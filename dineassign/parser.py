@@ -19,6 +19,11 @@ LIKERT_SCORES: dict[str, int | None] = {
 # Reverse lookup: score -> label
 LIKERT_LABELS: dict[int | None, str] = {v: k for k, v in LIKERT_SCORES.items()}
 
+# Safe YAML loader and dumper, using the libyaml-backed C implementations when
+# PyYAML has them
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 
 def parse_preferences_csv(csv_path: Path) -> tuple[list[Diner], list[str]]:
     """
@@ -30,8 +35,9 @@ def parse_preferences_csv(csv_path: Path) -> tuple[list[Diner], list[str]]:
     restaurants: list[str] = []
 
     with csv_path.open(newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames or []
+        # Plain rows indexed by column position; no per-row dict is needed
+        reader = csv.reader(f)
+        fieldnames = next(reader, [])
 
         # Find restaurant columns (everything after dietary restrictions)
         # Look for columns that aren't metadata
@@ -42,27 +48,32 @@ def parse_preferences_csv(csv_path: Path) -> tuple[list[Diner], list[str]]:
             "Do you have any dietary restrictions?",
         }
 
-        for col in fieldnames:
+        restaurant_columns: list[tuple[int, str]] = []
+        for i, col in enumerate(fieldnames):
             # Skip metadata and empty columns (like "Column 5")
             if col not in metadata_columns and col.strip() and not col.startswith("Column "):
+                restaurant_columns.append((i, col))
                 restaurants.append(col)
 
+        if "Email Address" not in fieldnames:
+            return diners, restaurants
+        email_column = fieldnames.index("Email Address")
+        neutral = LIKERT_SCORES["Neutral"]
+
         for row in reader:
-            email = row.get("Email Address", "").strip()
+            # Short rows (including blank lines) read as empty cells
+            if len(row) < len(fieldnames):
+                row += [""] * (len(fieldnames) - len(row))
+
+            email = row[email_column].strip()
             if not email:
                 continue
 
-            preferences: dict[str, int | None] = {}
-            for restaurant in restaurants:
-                raw_pref = row.get(restaurant, "").strip()
-                if raw_pref in LIKERT_SCORES:
-                    preferences[restaurant] = LIKERT_SCORES[raw_pref]
-                elif raw_pref == "":
-                    # Empty response treated as Neutral
-                    preferences[restaurant] = LIKERT_SCORES["Neutral"]
-                else:
-                    # Unknown response, treat as Neutral
-                    preferences[restaurant] = LIKERT_SCORES["Neutral"]
+            # Empty and unknown responses are both treated as Neutral
+            preferences: dict[str, int | None] = {
+                restaurant: LIKERT_SCORES.get(row[i].strip(), neutral)
+                for i, restaurant in restaurant_columns
+            }
 
             diners.append(Diner(email=email, preferences=preferences))
 
@@ -72,7 +83,7 @@ def parse_preferences_csv(csv_path: Path) -> tuple[list[Diner], list[str]]:
 def parse_reservations_yaml(yaml_path: Path) -> list[Reservation]:
     """Parse the reservations YAML file."""
     with yaml_path.open(encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_YamlLoader)
 
     if not data or "reservations" not in data:
         return []
@@ -127,4 +138,4 @@ def create_reservations_template(output_path: Path, restaurants: list[str], days
 
     with output_path.open("w", encoding="utf-8") as f:
         f.write(header)
-        yaml.dump(template, f, default_flow_style=False, sort_keys=False)
+        yaml.dump(template, f, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False)